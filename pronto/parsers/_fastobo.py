@@ -2,6 +2,7 @@ import datetime
 import functools
 import warnings
 from operator import attrgetter
+from sys import intern
 from typing import Union
 
 import fastobo
@@ -92,6 +93,12 @@ class FastoboParser:
 
 # --- Miscellaneous AST nodes ------------------------------------------------
 
+# NB: identifiers that are expected to be shared by many entities (namespaces,
+# subsets, relationship types and targets, xrefs...) are interned so that all
+# entities reference the same string object, which saves memory and lets
+# dictionary lookups (e.g. in the serializer identifier cache) short-circuit
+# on identity.
+
 
 def _extract_definition(clause: DefClause) -> Definition:
     return Definition(clause.definition, map(_extract_xref, clause.xrefs))
@@ -100,13 +107,13 @@ def _extract_definition(clause: DefClause) -> Definition:
 def _extract_property_value(pv: fastobo.pv.AbstractPropertyValue) -> PropertyValue:
     if isinstance(pv, fastobo.pv.LiteralPropertyValue):
         lpv = LiteralPropertyValue.__new__(LiteralPropertyValue)
-        lpv.property = str(pv.relation)
+        lpv.property = intern(str(pv.relation))
         lpv.literal = pv.value
-        lpv.datatype = str(pv.datatype)
+        lpv.datatype = intern(str(pv.datatype))
         return lpv
     elif isinstance(pv, fastobo.pv.ResourcePropertyValue):
         rpv = ResourcePropertyValue.__new__(ResourcePropertyValue)
-        rpv.property = str(pv.relation)
+        rpv.property = intern(str(pv.relation))
         rpv.resource = str(pv.value)
         return rpv
     else:
@@ -116,13 +123,13 @@ def _extract_property_value(pv: fastobo.pv.AbstractPropertyValue) -> PropertyVal
 
 def _extract_synonym_data(syn: fastobo.syn.Synonym) -> SynonymData:
     xrefs = map(_extract_xref, syn.xrefs)
-    type_ = str(syn.type) if syn.type is not None else None
+    type_ = intern(str(syn.type)) if syn.type is not None else None
     return SynonymData(syn.desc, syn.scope, type_, xrefs)
 
 
 def _extract_xref(xref: fastobo.xref.Xref) -> Xref:
     x = Xref.__new__(Xref)
-    x.id = str(xref.id)
+    x.id = intern(str(xref.id))
     x.description = xref.desc
     return x
 
@@ -365,7 +372,7 @@ def _process_clause_term_intersection_of(clause, entity, ont):
     if clause.typedef is None:
         entity.intersection_of.add(str(clause.term))
     else:
-        entity.intersection_of.add((str(clause.typedef), str(clause.term)))
+        entity.intersection_of.add((intern(str(clause.typedef)), str(clause.term)))
 
 
 @process_clause_typedef.register(fastobo.typedef.IntersectionOfClause)
@@ -380,12 +387,12 @@ def _process_clause_typedef_inverse_of(clause, entity, ont):
 
 @process_clause_term.register(fastobo.term.IsAClause)
 def _process_clause_term_is_a(clause, entity, ont):
-    ont._terms.lineage[entity.id].sup.add(str(clause.term))
+    ont._terms.lineage[entity.id].sup.add(intern(str(clause.term)))
 
 
 @process_clause_typedef.register(fastobo.typedef.IsAClause)
 def _process_clause_typedef_is_a(clause, entity, ont):
-    ont._relationships.lineage[entity.id].sup.add(str(clause.typedef))
+    ont._relationships.lineage[entity.id].sup.add(intern(str(clause.typedef)))
 
 
 @process_clause_term.register(fastobo.term.IsAnonymousClause)
@@ -464,7 +471,7 @@ def _process_clause_entity_name(clause, entity, ont):
 @process_clause_term.register(fastobo.term.NamespaceClause)
 @process_clause_typedef.register(fastobo.typedef.NamespaceClause)
 def _process_clause_entity_namespace(clause, entity, ont):
-    entity.namespace = str(clause.namespace)
+    entity.namespace = intern(str(clause.namespace))
 
 
 @process_clause_header.register(fastobo.header.PropertyValueClause)
@@ -481,12 +488,14 @@ def _process_clause_typedef_range(clause, entity, ont):
 
 @process_clause_term.register(fastobo.term.RelationshipClause)
 def _process_clause_term_relationship(clause, entity, ont):
-    entity.relationships.setdefault(str(clause.typedef), set()).add(str(clause.term))
+    targets = entity.relationships.setdefault(intern(str(clause.typedef)), set())
+    targets.add(intern(str(clause.term)))
 
 
 @process_clause_typedef.register(fastobo.typedef.RelationshipClause)
 def _process_clause_typedef_relationship(clause, entity, ont):
-    entity.relationships.setdefault(str(clause.typedef), set()).add(str(clause.target))
+    targets = entity.relationships.setdefault(intern(str(clause.typedef)), set())
+    targets.add(intern(str(clause.target)))
 
 
 @process_clause_term.register(fastobo.term.ReplacedByClause)
@@ -502,7 +511,7 @@ def _process_clause_typedef_replaced_by(clause, entity, ont):
 @process_clause_term.register(fastobo.term.SubsetClause)
 @process_clause_typedef.register(fastobo.typedef.SubsetClause)
 def _process_clause_entity_subset(clause, entity, ont):
-    entity.subsets.add(str(clause.subset))
+    entity.subsets.add(intern(str(clause.subset)))
 
 
 @process_clause_term.register(fastobo.term.SynonymClause)
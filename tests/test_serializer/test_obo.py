@@ -470,6 +470,46 @@ class TestOboSerializer(TestSerializer, unittest.TestCase):
             """
         )
 
+    def test_term_namespace(self):
+        self.assertRoundtrip(
+            """
+            format-version: 1.4
+            default-namespace: test
+
+            [Term]
+            id: TST:001
+
+            [Term]
+            id: TST:002
+            namespace: other
+            """
+        )
+
+    def test_term_relationship(self):
+        self.assertRoundtrip(
+            """
+            format-version: 1.4
+
+            [Term]
+            id: TST:001
+
+            [Term]
+            id: TST:002
+
+            [Term]
+            id: TST:003
+            relationship: has_part TST:001
+            relationship: part_of TST:001
+            relationship: part_of TST:002
+
+            [Typedef]
+            id: has_part
+
+            [Typedef]
+            id: part_of
+            """
+        )
+
     def test_term_replaced_by(self):
         self.assertRoundtrip(
             """
@@ -512,3 +552,18 @@ class TestOboSerializer(TestSerializer, unittest.TestCase):
             xref: PMC:135269
             """
         )
+
+    def test_term_xref_description(self):
+        self.assertRoundtrip(
+            """
+            format-version: 1.4
+
+            [Term]
+            id: TST:001
+            xref: PMC:135269 "first description"
+
+            [Term]
+            id: TST:002
+            xref: PMC:135269 "second description"
+            """
+        )